@@ -4,21 +4,35 @@ Google Drive MCP Server
 Provides full read/write access to Google Drive for Claude Desktop
 """
 
+import asyncio
 import os
 import sys
 import json
 import logging
 import base64
+import functools
+import binascii
+import importlib.util
 import mimetypes
 import re
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
+import httplib2
+import httpx
+from google_auth_httplib2 import AuthorizedHttp
+import google.auth.credentials
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaFileUpload, MediaInMemoryUpload, MediaIoBaseUpload
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
@@ -41,361 +55,665 @@ TOKEN_PATH = HOME / '.google-drive-mcp-token.json'
 CREDS_PATH = Path(os.environ.get('GOOGLE_APPLICATION_CREDENTIALS',
                                   HOME / 'Projects/mcp_servers/google-drive-mcp/gcp-oauth.keys.json'))
 
-def get_credentials():
-    """Get valid Google credentials with OAuth flow if needed"""
-    creds = None
-    
-    # Load existing token if available
-    if TOKEN_PATH.exists():
-        try:
-            creds = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
-            logger.info("Loaded existing credentials")
-        except Exception as e:
-            logger.warning(f"Could not load credentials: {e}")
-    
-    # Refresh or get new token
+# Google IDs are alphanumeric with underscores and hyphens, typically 20-60 chars.
+# Translating with this table deletes every allowed character, so a valid ID
+# translates to the empty string.
+_GOOGLE_ID_DROP = str.maketrans('', '', string.ascii_letters + string.digits + '_-')
+
+# REST endpoints called directly through the pooled httpx client.
+# googleapiclient is only used for media uploads and batch requests.
+DRIVE_API_URL = 'https://www.googleapis.com/drive/v3'
+DOCS_API_URL = 'https://docs.googleapis.com/v1'
+
+# Refresh the access token this long before it actually expires
+_TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Maximum number of sub-requests Drive accepts in a single batch call
+_BATCH_LIMIT = 100
+
+# Uploads at or below this size go out as a single multipart request;
+# larger ones use the resumable protocol
+_RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+
+# Block-level markdown: headings, bullet items and numbered items. These are
+# matched with pattern.match(markdown, line_start, line_end), which anchors
+# them to the start of the line without slicing it out first
+_HEADING_RE = re.compile(r'(#{1,6})\s+(.+)$')
+_BULLET_RE = re.compile(r'[\-\*]\s+')
+_NUMBERED_RE = re.compile(r'\d+\.\s+')
+
+# Heading level -> Google Docs named paragraph style
+_HEADING_STYLES = {
+    1: 'HEADING_1',
+    2: 'HEADING_2',
+    3: 'HEADING_3',
+    4: 'HEADING_4',
+    5: 'HEADING_5',
+    6: 'HEADING_6'
+}
+
+# Bullet presets for unordered and numbered lists
+_BULLET_PRESET = 'BULLET_DISC_CIRCLE_SQUARE'
+_NUMBERED_PRESET = 'NUMBERED_DECIMAL_ALPHA_ROMAN'
+
+# Request types whose ranges can be merged when neighbours share settings
+_MERGEABLE_REQUESTS = ('updateTextStyle', 'createParagraphBullets')
+
+# Translating with this table deletes every base64 alphabet character
+_BASE64_DROP = str.maketrans('', '', string.ascii_letters + string.digits + '+/=')
+
+# Chunk size for resumable uploads (must be a multiple of 256 KB)
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+# How long (seconds) a cached document end index is trusted before re-fetching
+_DOC_END_TTL = 30.0
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed
+_HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Worker threads for the blocking googleapiclient calls, so a request in
+# flight doesn't stall the event loop (and other tool calls) behind it
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='gdrive-api')
+_thread_state = threading.local()
+
+# Async HTTP client for the direct REST calls, created on first use
+_rest_client = None
+
+# doc_id -> (index just before the body's final newline, time.monotonic() when cached)
+_DOC_END_CACHE: dict[str, tuple[int, float]] = {}
+
+# doc_id -> lock held while an edit and its cache update are in flight, so
+# concurrent tool calls can't each advance the cached end from the same value
+_DOC_END_LOCKS: dict[str, asyncio.Lock] = {}
+
+# Credentials shared by every API client, loaded from TOKEN_PATH once
+_creds = None
+
+# Serializes loading, refreshing and saving the credentials across threads
+_CREDS_LOCK = threading.Lock()
+
+# Token JSON as last read from or written to TOKEN_PATH
+_last_token_json = None
+
+def save_token(creds):
+    """Write the token file, skipping the write if its contents wouldn't change"""
+    global _last_token_json
+    token_json = creds.to_json()
+    if token_json == _last_token_json:
+        return
+    TOKEN_PATH.write_text(token_json)
+    _last_token_json = token_json
+    logger.info(f"Token saved to {TOKEN_PATH}")
+
+def token_is_fresh(creds) -> bool:
+    """Check that credentials stay valid for at least _TOKEN_REFRESH_MARGIN"""
     if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            logger.info("Refreshing expired token")
-            creds.refresh(Request())
-        else:
-            logger.info("Starting OAuth flow...")
-            flow = InstalledAppFlow.from_client_secrets_file(str(CREDS_PATH), SCOPES)
-            creds = flow.run_local_server(port=0)
-            logger.info("OAuth flow completed successfully")
-        
-        # Save token
-        TOKEN_PATH.write_text(creds.to_json())
-        logger.info(f"Token saved to {TOKEN_PATH}")
-    
-    return creds
+        return False
+    if creds.expiry is None:
+        return True
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now > _TOKEN_REFRESH_MARGIN
 
-def init_drive_service():
-    """Initialize Google Drive API service"""
-    creds = get_credentials()
-    return build('drive', 'v3', credentials=creds)
+def get_credentials():
+    """Get valid Google credentials, reusing the in-memory copy and running the OAuth flow only if needed"""
+    global _creds, _last_token_json
+
+    # Cached credentials with time left on them need no disk or network access
+    if token_is_fresh(_creds):
+        return _creds
+
+    with _CREDS_LOCK:
+        # Another thread may have refreshed the token while we waited
+        if token_is_fresh(_creds):
+            return _creds
+
+        # Load existing token if available (once per process)
+        if _creds is None and TOKEN_PATH.exists():
+            try:
+                token_json = TOKEN_PATH.read_text()
+                _creds = Credentials.from_authorized_user_info(json.loads(token_json), SCOPES)
+                _last_token_json = token_json
+                logger.info("Loaded existing credentials")
+            except Exception as e:
+                logger.warning(f"Could not load credentials: {e}")
+
+        # Refresh or get new token
+        if not token_is_fresh(_creds):
+            if _creds and _creds.refresh_token:
+                # Refreshed in place, so everything holding this object sees the new token
+                logger.info("Refreshing token before it expires")
+                _creds.refresh(Request())
+            else:
+                logger.info("Starting OAuth flow...")
+                flow = InstalledAppFlow.from_client_secrets_file(str(CREDS_PATH), SCOPES)
+                _creds = flow.run_local_server(port=0)
+                logger.info("OAuth flow completed successfully")
+
+            # Save token
+            save_token(_creds)
+
+    return _creds
+
+class SharedCredentials(google.auth.credentials.Credentials):
+    """
+    Thread-safe view of the process-wide credentials for AuthorizedHttp.
+    Worker threads that find the token stale (or get a 401) all funnel into
+    one locked refresh, so concurrent requests trigger a single token fetch.
+
+    Subclasses the google-auth base class so googleapiclient (e.g. batch
+    requests) treats it as google-auth credentials; token state is read
+    from the wrapped object rather than copied, so the base initializer
+    is not run.
+    """
+
+    def __init__(self, creds):
+        self.wrapped = creds
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    @property
+    def token(self):
+        return self.wrapped.token
+
+    @property
+    def expiry(self):
+        return self.wrapped.expiry
+
+    @property
+    def valid(self):
+        return self.wrapped.valid
+
+    @property
+    def expired(self):
+        return self.wrapped.expired
+
+    def apply(self, headers, token=None):
+        self.wrapped.apply(headers, token=token)
+
+    def before_request(self, request, method, url, headers):
+        if not token_is_fresh(self.wrapped):
+            self.refresh(request)
+        self.wrapped.apply(headers)
+
+    def refresh(self, request):
+        stale_token = self.wrapped.token
+        with _CREDS_LOCK:
+            # Skip if another thread replaced the token while we waited
+            if self.wrapped.token == stale_token:
+                logger.info("Refreshing token")
+                self.wrapped.refresh(request)
+                save_token(self.wrapped)
 
-def init_docs_service():
-    """Initialize Google Docs API service"""
-    creds = get_credentials()
-    return build('docs', 'v1', credentials=creds)
+# Requests are always executed over thread_http(), which carries the
+# credentials, so the services are built on a plain httplib2.Http and
+# don't need a token to exist yet
+def init_drive_service():
+    """Initialize Google Drive API service from the bundled discovery document"""
+    return build('drive', 'v3', http=httplib2.Http(), static_discovery=True, cache_discovery=False)
+
+def init_services():
+    """Build the Drive service once per process (Docs calls go through the REST helpers)"""
+    global drive_service
+    if drive_service is None:
+        drive_service = init_drive_service()
+
+# Fixed response text
+_TOKEN_INVALID_MESSAGE = (
+    "⚠️ AUTHENTICATION ERROR: Google OAuth token is expired or invalid.\n\n"
+    "To fix this, run the following command in Terminal:\n"
+    "  cd ~/Projects/mcp_servers/google-drive-mcp && ./venv/bin/python3 -c \"from gdrive_server import get_credentials; get_credentials()\"\n\n"
+    "Then restart Claude Desktop."
+)
+_API_AUTH_ERROR_MESSAGE = (
+    "⚠️ AUTHENTICATION ERROR: Google API returned an auth error.\n\n"
+    "The OAuth token may have been revoked or expired.\n"
+    "To fix: Delete ~/.google-drive-mcp-token.json and restart Claude Desktop to re-authenticate."
+)
+_FILES_HEADER = "Files:\n\n"
+_FILE_ROW = "- {} (ID: {})\n  Type: {}\n  Modified: {}\n  Size: {} bytes\n\n"
+_FILE_FIELDS = itemgetter('name', 'id', 'mimeType')
 
 # Initialize server
 app = Server("google-drive")
 drive_service = None
-docs_service = None
+
+# Tool definitions never change at runtime, so build them once at import
+_TOOLS: list[Tool] = [
+    Tool(
+        name="list_files",
+        description="List files in Google Drive. Can filter by folder, name, or type.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_id": {"type": "string", "description": "Optional folder ID to list files from"},
+                "query": {"type": "string", "description": "Optional search query"},
+                "max_results": {"type": "number", "default": 100}
+            }
+        }
+    ),
+    Tool(
+        name="read_file",
+        description="Read contents of a text file from Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": {"type": "string", "description": "ID of the file to read"}
+            },
+            "required": ["file_id"]
+        }
+    ),
+    Tool(
+        name="create_file",
+        description="Create a new text file in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Name of the file"},
+                "content": {"type": "string", "description": "Content of the file"},
+                "folder_id": {"type": "string", "description": "Optional folder ID"}
+            },
+            "required": ["name", "content"]
+        }
+    ),
+    Tool(
+        name="update_file",
+        description="Update contents of an existing file",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": {"type": "string", "description": "ID of the file to update"},
+                "content": {"type": "string", "description": "New content"}
+            },
+            "required": ["file_id", "content"]
+        }
+    ),
+    Tool(
+        name="delete_file",
+        description="Delete a file from Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": {"type": "string", "description": "ID of the file to delete"}
+            },
+            "required": ["file_id"]
+        }
+    ),
+    Tool(
+        name="batch_delete_files",
+        description="Delete multiple files from Google Drive in batched requests",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_ids": {"type": "array", "items": {"type": "string"}, "description": "IDs of the files to delete"}
+            },
+            "required": ["file_ids"]
+        }
+    ),
+    Tool(
+        name="create_folder",
+        description="Create a new folder in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Name of the folder"},
+                "parent_id": {"type": "string", "description": "Optional parent folder ID"}
+            },
+            "required": ["name"]
+        }
+    ),
+    Tool(
+        name="search_files",
+        description="Search for files in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query (file name, content, etc.)"},
+                "max_results": {"type": "number", "default": 20}
+            },
+            "required": ["query"]
+        }
+    ),
+    Tool(
+        name="create_google_doc",
+        description="Create a new Google Doc with the specified title and content",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "title": {"type": "string", "description": "Title of the new Google Doc"},
+                "content": {"type": "string", "description": "Initial text content for the document"}
+            },
+            "required": ["title", "content"]
+        }
+    ),
+    Tool(
+        name="append_to_google_doc",
+        description="Append text to the end of an existing Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "doc_id": {"type": "string", "description": "ID of the Google Doc"},
+                "text": {"type": "string", "description": "Text to append to the document"}
+            },
+            "required": ["doc_id", "text"]
+        }
+    ),
+    Tool(
+        name="replace_google_doc_content",
+        description="Replace all content in a Google Doc with new text",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "doc_id": {"type": "string", "description": "ID of the Google Doc"},
+                "new_content": {"type": "string", "description": "New text content to replace existing content"}
+            },
+            "required": ["doc_id", "new_content"]
+        }
+    ),
+    Tool(
+        name="read_google_doc",
+        description="Read the full text content of a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "doc_id": {"type": "string", "description": "ID of the Google Doc"}
+            },
+            "required": ["doc_id"]
+        }
+    ),
+    Tool(
+        name="move_file",
+        description="Move a file to a different folder in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": {"type": "string", "description": "ID of the file to move"},
+                "new_folder_id": {"type": "string", "description": "ID of the destination folder"}
+            },
+            "required": ["file_id", "new_folder_id"]
+        }
+    ),
+    Tool(
+        name="batch_move_files",
+        description="Move multiple files to a different folder in Google Drive in batched requests",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_ids": {"type": "array", "items": {"type": "string"}, "description": "IDs of the files to move"},
+                "new_folder_id": {"type": "string", "description": "ID of the destination folder"}
+            },
+            "required": ["file_ids", "new_folder_id"]
+        }
+    ),
+    Tool(
+        name="copy_file",
+        description="Create a copy of a file in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": {"type": "string", "description": "ID of the file to copy"},
+                "new_name": {"type": "string", "description": "Name for the copied file (optional, defaults to the name Drive assigns the copy)"},
+                "folder_id": {"type": "string", "description": "Optional folder ID for the copy"}
+            },
+            "required": ["file_id"]
+        }
+    ),
+    Tool(
+        name="upload_binary_file",
+        description="Upload a binary file (image, PDF, etc.) from a local path or base64 content to Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Name for the file in Google Drive"},
+                "local_path": {"type": "string", "description": "Local file path to upload (use this OR base64_content)"},
+                "base64_content": {"type": "string", "description": "Base64-encoded file content (use this OR local_path)"},
+                "mime_type": {"type": "string", "description": "MIME type (e.g., 'image/png', 'application/pdf'). Auto-detected if local_path provided."},
+                "folder_id": {"type": "string", "description": "Optional folder ID to upload into"}
+            },
+            "required": ["name"]
+        }
+    ),
+    Tool(
+        name="format_google_doc_text",
+        description="Apply formatting (bold, italic, underline, font size, color) to text in a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "doc_id": {"type": "string", "description": "ID of the Google Doc"},
+                "start_index": {"type": "number", "description": "Starting character index (1-based)"},
+                "end_index": {"type": "number", "description": "Ending character index"},
+                "bold": {"type": "boolean", "description": "Apply bold formatting"},
+                "italic": {"type": "boolean", "description": "Apply italic formatting"},
+                "underline": {"type": "boolean", "description": "Apply underline formatting"},
+                "font_size": {"type": "number", "description": "Font size in points (e.g., 12, 14, 18)"},
+                "color_hex": {"type": "string", "description": "Text color as hex (e.g., '#FF0000' for red)"}
+            },
+            "required": ["doc_id", "start_index", "end_index"]
+        }
+    ),
+    Tool(
+        name="insert_heading",
+        description="Insert a heading (H1-H6) into a Google Doc at a specific position",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "doc_id": {"type": "string", "description": "ID of the Google Doc"},
+                "text": {"type": "string", "description": "The heading text"},
+                "heading_level": {"type": "number", "description": "Heading level (1-6)"},
+                "index": {"type": "number", "description": "Position to insert (1 for beginning, or use 'end')"},
+                "at_end": {"type": "boolean", "description": "If true, insert at end of document"}
+            },
+            "required": ["doc_id", "text", "heading_level"]
+        }
+    ),
+    Tool(
+        name="insert_bullet_list",
+        description="Insert a bullet or numbered list into a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "doc_id": {"type": "string", "description": "ID of the Google Doc"},
+                "items": {"type": "array", "items": {"type": "string"}, "description": "List items to insert"},
+                "numbered": {"type": "boolean", "description": "If true, create numbered list; if false, bullet list"},
+                "index": {"type": "number", "description": "Position to insert (1 for beginning)"},
+                "at_end": {"type": "boolean", "description": "If true, insert at end of document"}
+            },
+            "required": ["doc_id", "items"]
+        }
+    ),
+    Tool(
+        name="markdown_to_google_doc",
+        description="Convert markdown content to a formatted Google Doc with headings, bold, italic, lists, and links",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "title": {"type": "string", "description": "Title for the new Google Doc"},
+                "markdown": {"type": "string", "description": "Markdown content to convert"},
+                "folder_id": {"type": "string", "description": "Optional folder ID to create the doc in"}
+            },
+            "required": ["title", "markdown"]
+        }
+    )
+]
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available Google Drive tools"""
-    return [
-        Tool(
-            name="list_files",
-            description="List files in Google Drive. Can filter by folder, name, or type.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "folder_id": {"type": "string", "description": "Optional folder ID to list files from"},
-                    "query": {"type": "string", "description": "Optional search query"},
-                    "max_results": {"type": "number", "default": 100}
-                }
-            }
-        ),
-        Tool(
-            name="read_file",
-            description="Read contents of a text file from Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_id": {"type": "string", "description": "ID of the file to read"}
-                },
-                "required": ["file_id"]
-            }
-        ),
-        Tool(
-            name="create_file",
-            description="Create a new text file in Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Name of the file"},
-                    "content": {"type": "string", "description": "Content of the file"},
-                    "folder_id": {"type": "string", "description": "Optional folder ID"}
-                },
-                "required": ["name", "content"]
-            }
-        ),
-        Tool(
-            name="update_file",
-            description="Update contents of an existing file",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_id": {"type": "string", "description": "ID of the file to update"},
-                    "content": {"type": "string", "description": "New content"}
-                },
-                "required": ["file_id", "content"]
-            }
-        ),
-        Tool(
-            name="delete_file",
-            description="Delete a file from Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_id": {"type": "string", "description": "ID of the file to delete"}
-                },
-                "required": ["file_id"]
-            }
-        ),
-        Tool(
-            name="create_folder",
-            description="Create a new folder in Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Name of the folder"},
-                    "parent_id": {"type": "string", "description": "Optional parent folder ID"}
-                },
-                "required": ["name"]
-            }
-        ),
-        Tool(
-            name="search_files",
-            description="Search for files in Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search query (file name, content, etc.)"},
-                    "max_results": {"type": "number", "default": 20}
-                },
-                "required": ["query"]
-            }
-        ),
-        Tool(
-            name="create_google_doc",
-            description="Create a new Google Doc with the specified title and content",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "title": {"type": "string", "description": "Title of the new Google Doc"},
-                    "content": {"type": "string", "description": "Initial text content for the document"}
-                },
-                "required": ["title", "content"]
-            }
-        ),
-        Tool(
-            name="append_to_google_doc",
-            description="Append text to the end of an existing Google Doc",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "doc_id": {"type": "string", "description": "ID of the Google Doc"},
-                    "text": {"type": "string", "description": "Text to append to the document"}
-                },
-                "required": ["doc_id", "text"]
-            }
-        ),
-        Tool(
-            name="replace_google_doc_content",
-            description="Replace all content in a Google Doc with new text",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "doc_id": {"type": "string", "description": "ID of the Google Doc"},
-                    "new_content": {"type": "string", "description": "New text content to replace existing content"}
-                },
-                "required": ["doc_id", "new_content"]
-            }
-        ),
-        Tool(
-            name="read_google_doc",
-            description="Read the full text content of a Google Doc",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "doc_id": {"type": "string", "description": "ID of the Google Doc"}
-                },
-                "required": ["doc_id"]
-            }
-        ),
-        Tool(
-            name="move_file",
-            description="Move a file to a different folder in Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_id": {"type": "string", "description": "ID of the file to move"},
-                    "new_folder_id": {"type": "string", "description": "ID of the destination folder"}
-                },
-                "required": ["file_id", "new_folder_id"]
-            }
-        ),
-        Tool(
-            name="copy_file",
-            description="Create a copy of a file in Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_id": {"type": "string", "description": "ID of the file to copy"},
-                    "new_name": {"type": "string", "description": "Name for the copied file (optional, defaults to 'Copy of [original]')"},
-                    "folder_id": {"type": "string", "description": "Optional folder ID for the copy"}
-                },
-                "required": ["file_id"]
-            }
-        ),
-        Tool(
-            name="upload_binary_file",
-            description="Upload a binary file (image, PDF, etc.) from a local path or base64 content to Google Drive",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Name for the file in Google Drive"},
-                    "local_path": {"type": "string", "description": "Local file path to upload (use this OR base64_content)"},
-                    "base64_content": {"type": "string", "description": "Base64-encoded file content (use this OR local_path)"},
-                    "mime_type": {"type": "string", "description": "MIME type (e.g., 'image/png', 'application/pdf'). Auto-detected if local_path provided."},
-                    "folder_id": {"type": "string", "description": "Optional folder ID to upload into"}
-                },
-                "required": ["name"]
-            }
-        ),
-        Tool(
-            name="format_google_doc_text",
-            description="Apply formatting (bold, italic, underline, font size, color) to text in a Google Doc",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "doc_id": {"type": "string", "description": "ID of the Google Doc"},
-                    "start_index": {"type": "number", "description": "Starting character index (1-based)"},
-                    "end_index": {"type": "number", "description": "Ending character index"},
-                    "bold": {"type": "boolean", "description": "Apply bold formatting"},
-                    "italic": {"type": "boolean", "description": "Apply italic formatting"},
-                    "underline": {"type": "boolean", "description": "Apply underline formatting"},
-                    "font_size": {"type": "number", "description": "Font size in points (e.g., 12, 14, 18)"},
-                    "color_hex": {"type": "string", "description": "Text color as hex (e.g., '#FF0000' for red)"}
-                },
-                "required": ["doc_id", "start_index", "end_index"]
-            }
-        ),
-        Tool(
-            name="insert_heading",
-            description="Insert a heading (H1-H6) into a Google Doc at a specific position",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "doc_id": {"type": "string", "description": "ID of the Google Doc"},
-                    "text": {"type": "string", "description": "The heading text"},
-                    "heading_level": {"type": "number", "description": "Heading level (1-6)"},
-                    "index": {"type": "number", "description": "Position to insert (1 for beginning, or use 'end')"},
-                    "at_end": {"type": "boolean", "description": "If true, insert at end of document"}
-                },
-                "required": ["doc_id", "text", "heading_level"]
-            }
-        ),
-        Tool(
-            name="insert_bullet_list",
-            description="Insert a bullet or numbered list into a Google Doc",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "doc_id": {"type": "string", "description": "ID of the Google Doc"},
-                    "items": {"type": "array", "items": {"type": "string"}, "description": "List items to insert"},
-                    "numbered": {"type": "boolean", "description": "If true, create numbered list; if false, bullet list"},
-                    "index": {"type": "number", "description": "Position to insert (1 for beginning)"},
-                    "at_end": {"type": "boolean", "description": "If true, insert at end of document"}
-                },
-                "required": ["doc_id", "items"]
-            }
-        ),
-        Tool(
-            name="markdown_to_google_doc",
-            description="Convert markdown content to a formatted Google Doc with headings, bold, italic, lists, and links",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "title": {"type": "string", "description": "Title for the new Google Doc"},
-                    "markdown": {"type": "string", "description": "Markdown content to convert"},
-                    "folder_id": {"type": "string", "description": "Optional folder ID to create the doc in"}
-                },
-                "required": ["title", "markdown"]
-            }
-        )
-    ]
+    return _TOOLS
 
 def refresh_services_if_needed():
-    """Check if credentials are expired and refresh services if needed"""
-    global drive_service, docs_service
+    """Make sure the credentials are fresh and the API services are built"""
+    get_credentials()  # Only touches disk/network when the token needs refreshing
+    init_services()
+    return True
 
-    creds = get_credentials()  # This will refresh if expired
+def thread_http() -> AuthorizedHttp:
+    """Return this worker thread's authorized HTTP client (httplib2 is not thread-safe)"""
+    http = getattr(_thread_state, 'http', None)
+    if http is None or http.credentials.wrapped is not _creds:
+        http = AuthorizedHttp(SharedCredentials(_creds), http=httplib2.Http())
+        _thread_state.http = http
+    return http
+
+async def run_blocking(func, *args):
+    """Run a blocking callable on the API worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXECUTOR, func, *args)
+
+async def execute(request):
+    """Execute a googleapiclient request on the worker pool"""
+    return await run_blocking(lambda: request.execute(http=thread_http()))
+
+def rest_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client, creating it on first use"""
+    global _rest_client
+    if _rest_client is None:
+        # One pool of kept-alive connections shared by every tool call, so
+        # back-to-back calls reuse a warm TLS session to *.googleapis.com.
+        # With h2 installed, concurrent calls are multiplexed over that
+        # session instead of each holding a connection of its own
+        # Redirects are followed like httplib2 did (media downloads can 302)
+        _rest_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            follow_redirects=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32,
+                                keepalive_expiry=300)
+        )
+    return _rest_client
 
-    # Reinitialize services with fresh credentials
-    drive_service = build('drive', 'v3', credentials=creds)
-    docs_service = build('docs', 'v1', credentials=creds)
+def auth_headers() -> dict:
+    """Authorization headers for the current credentials"""
+    headers = {}
+    _creds.apply(headers)
+    return headers
 
-    return True
+def raise_for_api_error(response: httpx.Response):
+    """
+    Raise with Google's error message, the way googleapiclient's HttpError does.
+    Anything but a 2xx is rejected, so an unfollowed redirect never passes as data.
+    """
+    if response.is_success:
+        return
+    try:
+        message = response.json()['error']['message']
+    except (ValueError, KeyError, TypeError):
+        message = response.text
+    raise httpx.HTTPStatusError(
+        f"HTTP {response.status_code}: {message}",
+        request=response.request,
+        response=response
+    )
+
+async def rest_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Call a Google REST endpoint directly from the event loop"""
+    response = await rest_client().request(method, url, headers=auth_headers(), **kwargs)
+    raise_for_api_error(response)
+    return response
+
+async def rest_download(url: str, params: dict) -> bytearray:
+    """Stream a download into one growing bytearray instead of joining chunks at the end"""
+    async with rest_client().stream('GET', url, params=params, headers=auth_headers()) as response:
+        if not response.is_success:
+            await response.aread()
+            raise_for_api_error(response)
+        data = bytearray()
+        async for chunk in response.aiter_bytes():
+            data += chunk
+    return data
+
+async def rest_json(method: str, url: str, **kwargs) -> dict:
+    """Call a Google REST endpoint and return the decoded JSON body"""
+    response = await rest_request(method, url, **kwargs)
+    return response.json()
+
+async def get_document(doc_id: str, fields: str | None = None) -> dict:
+    """Fetch a Google Doc (documents.get), optionally limited to a fields mask"""
+    params = {'fields': fields} if fields else None
+    return await rest_json('GET', f"{DOCS_API_URL}/documents/{doc_id}", params=params)
+
+async def batch_update_document(doc_id: str, requests: list[dict]) -> dict:
+    """Apply a list of requests to a Google Doc (documents.batchUpdate)"""
+    # Callers don't use the per-request replies, so don't ask for them
+    return await rest_json('POST', f"{DOCS_API_URL}/documents/{doc_id}:batchUpdate",
+                           params={'fields': 'documentId'}, json={'requests': requests})
+
+def doc_text_length(text: str) -> int:
+    """Length of text in Docs index units (UTF-16 code units, not code points)"""
+    return len(text.encode('utf-16-le')) // 2
+
+async def document_end_index(doc_id: str) -> tuple[int, bool]:
+    """
+    Index just before a Doc body's final newline, i.e. where appended text goes.
+    Returns (index, from_cache); cached values are used for up to _DOC_END_TTL seconds
+    and are kept current by inserts made through this server.
+    """
+    cached = _DOC_END_CACHE.get(doc_id)
+    if cached and time.monotonic() - cached[1] < _DOC_END_TTL:
+        return cached[0], True
+    doc = await get_document(doc_id, fields='body(content(endIndex))')
+    index = doc['body']['content'][-1]['endIndex'] - 1
+    _DOC_END_CACHE[doc_id] = (index, time.monotonic())
+    return index, False
+
+def document_lock(doc_id: str) -> asyncio.Lock:
+    """Lock serializing this server's edits to a Google Doc that touch its cached end index"""
+    return _DOC_END_LOCKS.setdefault(doc_id, asyncio.Lock())
+
+async def batch_update_at_end(doc_id: str, requests_at, inserted_length: int):
+    """
+    Apply requests_at(end_index) to a Google Doc, where the requests insert
+    inserted_length UTF-16 code units (see doc_text_length) at the end of the
+    body. A cached end index that turns out to be past the end (the doc shrank
+    elsewhere) is re-fetched and the update retried once.
+    """
+    async with document_lock(doc_id):
+        index, from_cache = await document_end_index(doc_id)
+        try:
+            await batch_update_document(doc_id, requests_at(index))
+        except httpx.HTTPStatusError as e:
+            if not from_cache or e.response.status_code != 400:
+                raise
+            _DOC_END_CACHE.pop(doc_id, None)
+            index, _ = await document_end_index(doc_id)
+            await batch_update_document(doc_id, requests_at(index))
+        # The entry now holds (index, time of the fetch it came from); keep
+        # that time so the TTL still forces a re-fetch of outside edits
+        shift_document_end(doc_id, inserted_length)
+
+def shift_document_end(doc_id: str, inserted_length: int):
+    """
+    Advance a cached end index after text was inserted anywhere in the body;
+    inserted_length is in UTF-16 code units (see doc_text_length).
+    """
+    cached = _DOC_END_CACHE.get(doc_id)
+    if cached:
+        _DOC_END_CACHE[doc_id] = (cached[0] + inserted_length, cached[1])
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool calls"""
-    global drive_service, docs_service
-
-    # Always ensure we have fresh credentials before each call
+    # Ensure we have valid credentials (only rebuilds once the token expires)
     try:
-        refresh_services_if_needed()
+        await run_blocking(refresh_services_if_needed)
     except Exception as e:
         error_msg = str(e)
         if 'invalid_grant' in error_msg.lower() or 'token' in error_msg.lower():
             logger.error(f"TOKEN EXPIRED OR INVALID: {e}")
             return [TextContent(
                 type="text",
-                text=f"⚠️ AUTHENTICATION ERROR: Google OAuth token is expired or invalid.\n\n"
-                     f"To fix this, run the following command in Terminal:\n"
-                     f"  cd ~/Projects/mcp_servers/google-drive-mcp && ./venv/bin/python3 -c \"from gdrive_server import get_credentials; get_credentials()\"\n\n"
-                     f"Then restart Claude Desktop."
+                text=_TOKEN_INVALID_MESSAGE
             )]
         else:
             logger.error(f"Failed to initialize Google services: {e}", exc_info=True)
             return [TextContent(type="text", text=f"Failed to connect to Google Drive: {str(e)}")]
 
     try:
-        if name == "list_files":
-            return await list_files_impl(arguments)
-        elif name == "read_file":
-            return await read_file_impl(arguments)
-        elif name == "create_file":
-            return await create_file_impl(arguments)
-        elif name == "update_file":
-            return await update_file_impl(arguments)
-        elif name == "delete_file":
-            return await delete_file_impl(arguments)
-        elif name == "create_folder":
-            return await create_folder_impl(arguments)
-        elif name == "search_files":
-            return await search_files_impl(arguments)
-        elif name == "create_google_doc":
-            return await create_google_doc_impl(arguments)
-        elif name == "append_to_google_doc":
-            return await append_to_google_doc_impl(arguments)
-        elif name == "replace_google_doc_content":
-            return await replace_google_doc_content_impl(arguments)
-        elif name == "read_google_doc":
-            return await read_google_doc_impl(arguments)
-        elif name == "move_file":
-            return await move_file_impl(arguments)
-        elif name == "copy_file":
-            return await copy_file_impl(arguments)
-        elif name == "upload_binary_file":
-            return await upload_binary_file_impl(arguments)
-        elif name == "format_google_doc_text":
-            return await format_google_doc_text_impl(arguments)
-        elif name == "insert_heading":
-            return await insert_heading_impl(arguments)
-        elif name == "insert_bullet_list":
-            return await insert_bullet_list_impl(arguments)
-        elif name == "markdown_to_google_doc":
-            return await markdown_to_google_doc_impl(arguments)
-        else:
+        handler = _HANDLERS.get(name)
+        if handler is None:
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
+        return await handler(arguments)
     except Exception as e:
         error_msg = str(e)
         # Check for auth-related errors in API calls
@@ -403,9 +721,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             logger.error(f"AUTH ERROR during API call: {e}")
             return [TextContent(
                 type="text",
-                text=f"⚠️ AUTHENTICATION ERROR: Google API returned an auth error.\n\n"
-                     f"The OAuth token may have been revoked or expired.\n"
-                     f"To fix: Delete ~/.google-drive-mcp-token.json and restart Claude Desktop to re-authenticate."
+                text=_API_AUTH_ERROR_MESSAGE
             )]
         logger.error(f"Error calling tool {name}: {e}", exc_info=True)
         return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -418,7 +734,8 @@ async def list_files_impl(args: dict) -> list[TextContent]:
         folder_id = args['folder_id']
         if not validate_google_id(folder_id):
             return [TextContent(type="text", text="Error: Invalid folder ID format")]
-        query_parts.append(f"'{sanitize_query_string(folder_id)}' in parents")
+        # Validated IDs can't contain quotes, so they need no escaping
+        query_parts.append(f"'{folder_id}' in parents")
     if args.get("query"):
         # Sanitize user-provided query to prevent injection
         sanitized_query = sanitize_query_string(args["query"])
@@ -427,28 +744,29 @@ async def list_files_impl(args: dict) -> list[TextContent]:
     query = " and ".join(query_parts) if query_parts else None
 
     # Bound max_results to reasonable limits
-    max_results = min(args.get("max_results", 100), 500)
+    max_results = min(int(args.get("max_results", 100)), 500)
 
-    results = drive_service.files().list(
-        q=query,
-        pageSize=max_results,
-        fields="files(id, name, mimeType, modifiedTime, size)"
-    ).execute()
+    params = {
+        'pageSize': max_results,
+        'fields': "files(id, name, mimeType, modifiedTime, size)"
+    }
+    if query:
+        params['q'] = query
+
+    results = await rest_json('GET', f"{DRIVE_API_URL}/files", params=params)
     
     files = results.get('files', [])
     
     if not files:
         return [TextContent(type="text", text="No files found")]
     
-    output = "Files:\n\n"
-    for f in files:
-        size = f.get('size', 'N/A')
-        output += f"- {f['name']} (ID: {f['id']})\n"
-        output += f"  Type: {f['mimeType']}\n"
-        output += f"  Modified: {f.get('modifiedTime', 'N/A')}\n"
-        output += f"  Size: {size} bytes\n\n"
-    
-    return [TextContent(type="text", text=output)]
+    parts = [_FILES_HEADER]
+    parts.extend(
+        _FILE_ROW.format(*_FILE_FIELDS(f), f.get('modifiedTime', 'N/A'), f.get('size', 'N/A'))
+        for f in files
+    )
+
+    return [TextContent(type="text", text="".join(parts))]
 
 async def read_file_impl(args: dict) -> list[TextContent]:
     """Read file contents"""
@@ -458,29 +776,25 @@ async def read_file_impl(args: dict) -> list[TextContent]:
         return [TextContent(type="text", text="Error: Invalid file ID format")]
 
     # Get file metadata
-    file = drive_service.files().get(fileId=file_id).execute()
+    file = await rest_json('GET', f"{DRIVE_API_URL}/files/{file_id}", params={'fields': 'name, mimeType'})
     mime_type = file.get('mimeType', '')
     
     # Download content
     if 'google-apps' in mime_type:
         # Export Google Docs/Sheets/Slides
         if 'document' in mime_type:
-            request = drive_service.files().export_media(fileId=file_id, mimeType='text/plain')
+            url, params = f"{DRIVE_API_URL}/files/{file_id}/export", {'mimeType': 'text/plain'}
         elif 'spreadsheet' in mime_type:
-            request = drive_service.files().export_media(fileId=file_id, mimeType='text/csv')
+            url, params = f"{DRIVE_API_URL}/files/{file_id}/export", {'mimeType': 'text/csv'}
         else:
             return [TextContent(type="text", text=f"Cannot read file type: {mime_type}")]
     else:
-        request = drive_service.files().get_media(fileId=file_id)
-    
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
+        url, params = f"{DRIVE_API_URL}/files/{file_id}", {'alt': 'media'}
     
+    data = await rest_download(url, params)
+
     try:
-        content = fh.getvalue().decode('utf-8')
+        content = data.decode('utf-8')
     except UnicodeDecodeError:
         return [TextContent(type="text", text=f"Error: File '{file['name']}' appears to be binary and cannot be displayed as text")]
 
@@ -496,17 +810,13 @@ async def create_file_impl(args: dict) -> list[TextContent]:
     if args.get('folder_id'):
         file_metadata['parents'] = [args['folder_id']]
     
-    media = MediaFileUpload(
-        io.BytesIO(args['content'].encode('utf-8')),
-        mimetype='text/plain',
-        resumable=True
-    )
+    media = text_upload(args['content'])
     
-    file = drive_service.files().create(
+    file = await execute(drive_service.files().create(
         body=file_metadata,
         media_body=media,
         fields='id, name, webViewLink'
-    ).execute()
+    ))
     
     return [TextContent(
         type="text",
@@ -518,16 +828,13 @@ async def update_file_impl(args: dict) -> list[TextContent]:
     if not validate_google_id(args['file_id']):
         return [TextContent(type="text", text="Error: Invalid file ID format")]
 
-    media = MediaFileUpload(
-        io.BytesIO(args['content'].encode('utf-8')),
-        mimetype='text/plain',
-        resumable=True
-    )
+    media = text_upload(args['content'])
     
-    file = drive_service.files().update(
+    file = await execute(drive_service.files().update(
         fileId=args['file_id'],
-        media_body=media
-    ).execute()
+        media_body=media,
+        fields='id'
+    ))
     
     return [TextContent(type="text", text=f"Updated file ID: {file['id']}")]
 
@@ -537,7 +844,7 @@ async def delete_file_impl(args: dict) -> list[TextContent]:
     if not validate_google_id(file_id):
         return [TextContent(type="text", text="Error: Invalid file ID format")]
 
-    drive_service.files().delete(fileId=file_id).execute()
+    await rest_request('DELETE', f"{DRIVE_API_URL}/files/{file_id}")
     return [TextContent(type="text", text=f"Deleted file ID: {file_id}")]
 
 async def create_folder_impl(args: dict) -> list[TextContent]:
@@ -553,13 +860,17 @@ async def create_folder_impl(args: dict) -> list[TextContent]:
     if args.get('parent_id'):
         file_metadata['parents'] = [args['parent_id']]
     
-    folder = drive_service.files().create(
-        body=file_metadata,
-        fields='id, name'
-    ).execute()
+    folder = await rest_json('POST', f"{DRIVE_API_URL}/files",
+                             params={'fields': 'id, name'}, json=file_metadata)
     
     return [TextContent(type="text", text=f"Created folder: {folder['name']}\nID: {folder['id']}")]
 
+def text_upload(content: str) -> MediaInMemoryUpload:
+    """Wrap text content for upload, only going resumable for large payloads"""
+    data = content.encode('utf-8')
+    return MediaInMemoryUpload(data, mimetype='text/plain',
+                               resumable=len(data) > _RESUMABLE_THRESHOLD)
+
 def sanitize_query_string(value: str) -> str:
     """Escape single quotes in query strings to prevent injection"""
     if not value:
@@ -569,11 +880,13 @@ def sanitize_query_string(value: str) -> str:
 
 def validate_google_id(id_str: str) -> bool:
     """Validate that a string looks like a Google Drive/Docs ID"""
-    if not id_str or not isinstance(id_str, str):
-        return False
-    # Google IDs are alphanumeric with underscores and hyphens, typically 20-60 chars
-    import re
-    return bool(re.match(r'^[a-zA-Z0-9_-]{10,100}$', id_str))
+    # Type check first: non-string arguments may be unhashable
+    return isinstance(id_str, str) and is_google_id_string(id_str)
+
+@functools.lru_cache(maxsize=1024)
+def is_google_id_string(id_str: str) -> bool:
+    """ID format check for strings, memoized since the same IDs recur across calls"""
+    return 10 <= len(id_str) <= 100 and not id_str.translate(_GOOGLE_ID_DROP)
 
 async def search_files_impl(args: dict) -> list[TextContent]:
     """Search for files"""
@@ -581,48 +894,37 @@ async def search_files_impl(args: dict) -> list[TextContent]:
     query = f"name contains '{search_term}'"
 
     # Bound max_results to reasonable limits
-    max_results = min(args.get('max_results', 20), 100)
+    max_results = min(int(args.get('max_results', 20)), 100)
 
-    results = drive_service.files().list(
-        q=query,
-        pageSize=max_results,
-        fields="files(id, name, mimeType)"
-    ).execute()
+    results = await rest_json('GET', f"{DRIVE_API_URL}/files", params={
+        'q': query,
+        'pageSize': max_results,
+        'fields': "files(id, name, mimeType)"
+    })
     
     files = results.get('files', [])
     
     if not files:
         return [TextContent(type="text", text="No files found matching your search")]
     
-    output = f"Found {len(files)} file(s):\n\n"
-    for f in files:
-        output += f"- {f['name']} (ID: {f['id']})\n"
-    
-    return [TextContent(type="text", text=output)]
+    parts = [f"Found {len(files)} file(s):\n\n"]
+    parts.extend(f"- {f['name']} (ID: {f['id']})\n" for f in files)
+
+    return [TextContent(type="text", text="".join(parts))]
 
 async def create_google_doc_impl(args: dict) -> list[TextContent]:
     """Create a new Google Doc with content"""
     title = args['title']
     content = args['content']
     
-    # Create empty doc
-    doc = docs_service.documents().create(body={'title': title}).execute()
-    doc_id = doc['documentId']
-    
-    # Insert content if provided
-    if content:
-        requests = [
-            {
-                'insertText': {
-                    'location': {'index': 1},
-                    'text': content
-                }
-            }
-        ]
-        docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={'requests': requests}
-        ).execute()
+    # Create the doc through Drive, which converts an uploaded plain-text
+    # body into the document's content in the same request
+    doc = await execute(drive_service.files().create(
+        body={'name': title, 'mimeType': 'application/vnd.google-apps.document'},
+        media_body=text_upload(content) if content else None,
+        fields='id'
+    ))
+    doc_id = doc['id']
     
     return [TextContent(
         type="text",
@@ -637,24 +939,20 @@ async def append_to_google_doc_impl(args: dict) -> list[TextContent]:
 
     text = args['text']
 
-    # Get current document to find end index
-    doc = docs_service.documents().get(documentId=doc_id).execute()
-    end_index = doc['body']['content'][-1]['endIndex'] - 1
-    
-    # Insert text at the end
+    # Insert text at the end of the body; endOfSegmentLocation saves
+    # looking up the end index first
     requests = [
         {
             'insertText': {
-                'location': {'index': end_index},
+                'endOfSegmentLocation': {},
                 'text': text
             }
         }
     ]
     
-    docs_service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': requests}
-    ).execute()
+    async with document_lock(doc_id):
+        await batch_update_document(doc_id, requests)
+        shift_document_end(doc_id, doc_text_length(text))
     
     return [TextContent(type="text", text=f"Appended text to document {doc_id}")]
 
@@ -666,55 +964,37 @@ async def replace_google_doc_content_impl(args: dict) -> list[TextContent]:
 
     new_content = args['new_content']
 
-    # Get current document
-    doc = docs_service.documents().get(documentId=doc_id).execute()
+    # Get the current document's structural end indexes
+    doc = await get_document(doc_id, fields='body.content(endIndex)')
     
-    # Find the range of existing content (skip the trailing newline)
-    content = doc['body']['content']
-    if len(content) > 1:
-        start_index = 1
-        end_index = content[-1]['endIndex'] - 1
-        
-        requests = []
-        
-        # Delete existing content if there is any
-        if end_index > start_index:
-            requests.append({
-                'deleteContentRange': {
-                    'range': {
-                        'startIndex': start_index,
-                        'endIndex': end_index
-                    }
-                }
-            })
-        
-        # Insert new content
+    # Existing content runs from index 1 up to the body's trailing newline
+    end_index = doc['body']['content'][-1]['endIndex'] - 1
+
+    requests = []
+
+    # Delete existing content if there is any
+    if end_index > 1:
         requests.append({
-            'insertText': {
-                'location': {'index': 1},
-                'text': new_content
-            }
-        })
-        
-        docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={'requests': requests}
-        ).execute()
-    else:
-        # Empty doc, just insert
-        requests = [
-            {
-                'insertText': {
-                    'location': {'index': 1},
-                    'text': new_content
+            'deleteContentRange': {
+                'range': {
+                    'startIndex': 1,
+                    'endIndex': end_index
                 }
             }
-        ]
-        docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={'requests': requests}
-        ).execute()
-    
+        })
+
+    # Insert new content
+    requests.append({
+        'insertText': {
+            'location': {'index': 1},
+            'text': new_content
+        }
+    })
+
+    async with document_lock(doc_id):
+        await batch_update_document(doc_id, requests)
+        _DOC_END_CACHE.pop(doc_id, None)
+
     return [TextContent(type="text", text=f"Replaced content in document {doc_id}")]
 
 async def read_google_doc_impl(args: dict) -> list[TextContent]:
@@ -723,7 +1003,7 @@ async def read_google_doc_impl(args: dict) -> list[TextContent]:
     if not validate_google_id(doc_id):
         return [TextContent(type="text", text="Error: Invalid document ID format")]
 
-    doc = docs_service.documents().get(documentId=doc_id).execute()
+    doc = await get_document(doc_id, fields='title,body.content(paragraph(elements(textRun(content))))')
     title = doc.get('title', 'Untitled')
     
     # Extract text from document
@@ -749,20 +1029,110 @@ async def move_file_impl(args: dict) -> list[TextContent]:
         return [TextContent(type="text", text="Error: Invalid folder ID format")]
 
     # Get current parents
-    file = drive_service.files().get(fileId=file_id, fields='parents, name').execute()
+    file = await rest_json('GET', f"{DRIVE_API_URL}/files/{file_id}", params={'fields': 'parents'})
     previous_parents = ",".join(file.get('parents', []))
 
     # Move the file
-    file = drive_service.files().update(
-        fileId=file_id,
-        addParents=new_folder_id,
-        removeParents=previous_parents,
-        fields='id, name, parents'
-    ).execute()
+    file = await rest_json('PATCH', f"{DRIVE_API_URL}/files/{file_id}", params={
+        'addParents': new_folder_id,
+        'removeParents': previous_parents,
+        'fields': 'name'
+    })
 
     return [TextContent(type="text", text=f"Moved '{file['name']}' to folder {new_folder_id}")]
 
 
+def run_drive_batch(requests: list[tuple[str, Any]]) -> tuple[dict, dict]:
+    """
+    Execute (request_id, request) pairs through the Drive batch endpoint,
+    packing up to _BATCH_LIMIT sub-requests into each HTTP call.
+    Returns (responses, errors), both keyed by request_id.
+    Blocking; run via run_blocking.
+    """
+    responses = {}
+    errors = {}
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            responses[request_id] = response
+
+    for start in range(0, len(requests), _BATCH_LIMIT):
+        batch = drive_service.new_batch_http_request(callback=callback)
+        for request_id, request in requests[start:start + _BATCH_LIMIT]:
+            batch.add(request, request_id=request_id)
+        batch.execute(http=thread_http())
+
+    return responses, errors
+
+
+def format_batch_errors(errors: dict) -> str:
+    """Format per-file batch failures for a tool response"""
+    if not errors:
+        return ""
+    lines = [f"\nFailed ({len(errors)}):"]
+    lines.extend(f"- {file_id}: {error}" for file_id, error in errors.items())
+    return "\n".join(lines)
+
+
+async def batch_delete_files_impl(args: dict) -> list[TextContent]:
+    """Delete several files using batched Drive requests"""
+    # Batch request IDs must be unique, so drop duplicates but keep order
+    file_ids = list(dict.fromkeys(args['file_ids']))
+
+    if not file_ids:
+        return [TextContent(type="text", text="Error: No file IDs provided")]
+    for file_id in file_ids:
+        if not validate_google_id(file_id):
+            return [TextContent(type="text", text=f"Error: Invalid file ID format: {file_id}")]
+
+    _, errors = await run_blocking(run_drive_batch, [
+        (file_id, drive_service.files().delete(fileId=file_id))
+        for file_id in file_ids
+    ])
+
+    deleted = len(file_ids) - len(errors)
+    return [TextContent(type="text", text=f"Deleted {deleted} file(s){format_batch_errors(errors)}")]
+
+
+async def batch_move_files_impl(args: dict) -> list[TextContent]:
+    """Move several files to a folder using batched Drive requests"""
+    file_ids = list(dict.fromkeys(args['file_ids']))
+    new_folder_id = args['new_folder_id']
+
+    if not file_ids:
+        return [TextContent(type="text", text="Error: No file IDs provided")]
+    for file_id in file_ids:
+        if not validate_google_id(file_id):
+            return [TextContent(type="text", text=f"Error: Invalid file ID format: {file_id}")]
+    if not validate_google_id(new_folder_id):
+        return [TextContent(type="text", text="Error: Invalid folder ID format")]
+
+    # Look up every file's current parents in one batch...
+    files, errors = await run_blocking(run_drive_batch, [
+        (file_id, drive_service.files().get(fileId=file_id, fields='parents'))
+        for file_id in file_ids
+    ])
+
+    # ...then re-parent all of them in a second one
+    moved, move_errors = await run_blocking(run_drive_batch, [
+        (file_id, drive_service.files().update(
+            fileId=file_id,
+            addParents=new_folder_id,
+            removeParents=",".join(file.get('parents', [])),
+            fields='id'
+        ))
+        for file_id, file in files.items()
+    ])
+    errors.update(move_errors)
+
+    return [TextContent(
+        type="text",
+        text=f"Moved {len(moved)} file(s) to folder {new_folder_id}{format_batch_errors(errors)}"
+    )]
+
+
 async def copy_file_impl(args: dict) -> list[TextContent]:
     """Copy a file"""
     file_id = args['file_id']
@@ -774,20 +1144,15 @@ async def copy_file_impl(args: dict) -> list[TextContent]:
     if folder_id and not validate_google_id(folder_id):
         return [TextContent(type="text", text="Error: Invalid folder ID format")]
 
-    # Get original file name if no new name provided
-    if not new_name:
-        original = drive_service.files().get(fileId=file_id, fields='name').execute()
-        new_name = f"Copy of {original['name']}"
-
-    body = {'name': new_name}
+    # Without a name Drive names the copy itself; the response reports it
+    body = {}
+    if new_name:
+        body['name'] = new_name
     if folder_id:
         body['parents'] = [folder_id]
 
-    copied_file = drive_service.files().copy(
-        fileId=file_id,
-        body=body,
-        fields='id, name, webViewLink'
-    ).execute()
+    copied_file = await rest_json('POST', f"{DRIVE_API_URL}/files/{file_id}/copy",
+                                  params={'fields': 'id, name, webViewLink'}, json=body)
 
     return [TextContent(
         type="text",
@@ -795,6 +1160,66 @@ async def copy_file_impl(args: dict) -> list[TextContent]:
     )]
 
 
+@functools.lru_cache(maxsize=256)
+def mime_type_for_suffix(suffix: str) -> str | None:
+    """Guess a MIME type from a file extension, memoized per extension"""
+    return mimetypes.guess_type('x' + suffix)[0]
+
+
+def is_plain_base64(encoded: str) -> bool:
+    """Check for unbroken base64: alphabet characters only, padding only at the end"""
+    data = encoded.rstrip('=')
+    return (len(encoded) % 4 == 0
+            and not encoded.translate(_BASE64_DROP)
+            and len(encoded) - len(data) <= 2
+            and '=' not in data)
+
+
+class Base64Stream(io.RawIOBase):
+    """
+    Seekable, read-only byte stream over base64 text that decodes on demand.
+    A resumable upload reading from it decodes each chunk as it sends it,
+    rather than decoding the whole payload into memory first.
+    The text must satisfy is_plain_base64().
+    """
+
+    def __init__(self, encoded: str):
+        self._encoded = encoded
+        padding = len(encoded) - len(encoded.rstrip('='))
+        self._size = len(encoded) // 4 * 3 - padding
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self._size + offset
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        start = self._pos
+        end = self._size if size is None or size < 0 else min(self._size, start + size)
+        if start >= end:
+            return b''
+        # Every 4 characters decode to 3 bytes, so decode just the groups covering the range
+        first_group = start // 3
+        last_group = -(-end // 3)
+        decoded = binascii.a2b_base64(self._encoded[first_group * 4:last_group * 4])
+        self._pos = end
+        return decoded[start - first_group * 3:end - first_group * 3]
+
+
 async def upload_binary_file_impl(args: dict) -> list[TextContent]:
     """Upload a binary file from local path or base64 content"""
     name = args['name']
@@ -817,36 +1242,54 @@ async def upload_binary_file_impl(args: dict) -> list[TextContent]:
 
         # Auto-detect mime type if not provided
         if not mime_type:
-            mime_type, _ = mimetypes.guess_type(str(path))
+            mime_type = mime_type_for_suffix(path.suffix.lower())
             if not mime_type:
                 mime_type = 'application/octet-stream'
 
-        media = MediaFileUpload(str(path), mimetype=mime_type, resumable=True)
+        # MediaFileUpload opens and stats the file, so keep that off the event loop
+        media = await run_blocking(lambda: MediaFileUpload(
+            str(path),
+            mimetype=mime_type,
+            resumable=path.stat().st_size > _RESUMABLE_THRESHOLD
+        ))
     else:
         # Upload from base64 content
         if not mime_type:
             return [TextContent(type="text", text="Error: mime_type is required when using base64_content")]
 
-        try:
-            file_content = base64.b64decode(base64_content)
-        except Exception as e:
-            return [TextContent(type="text", text=f"Error: Invalid base64 content: {str(e)}")]
-
-        media = MediaFileUpload(
-            io.BytesIO(file_content),
-            mimetype=mime_type,
-            resumable=True
-        )
+        # Scanning or decoding a large payload is CPU-bound, so both happen
+        # on the worker pool to keep the event loop responsive
+        if (len(base64_content) // 4 * 3 > _RESUMABLE_THRESHOLD
+                and await run_blocking(is_plain_base64, base64_content)):
+            # Large payloads are decoded chunk by chunk as the upload reads them
+            media = MediaIoBaseUpload(
+                Base64Stream(base64_content),
+                mimetype=mime_type,
+                chunksize=_UPLOAD_CHUNK_SIZE,
+                resumable=True
+            )
+        else:
+            try:
+                file_content = await run_blocking(base64.b64decode, base64_content)
+            except Exception as e:
+                return [TextContent(type="text", text=f"Error: Invalid base64 content: {str(e)}")]
+
+            media = MediaIoBaseUpload(
+                io.BytesIO(file_content),
+                mimetype=mime_type,
+                chunksize=_UPLOAD_CHUNK_SIZE,
+                resumable=len(file_content) > _RESUMABLE_THRESHOLD
+            )
 
     file_metadata = {'name': name}
     if folder_id:
         file_metadata['parents'] = [folder_id]
 
-    file = drive_service.files().create(
+    file = await execute(drive_service.files().create(
         body=file_metadata,
         media_body=media,
         fields='id, name, webViewLink, mimeType'
-    ).execute()
+    ))
 
     return [TextContent(
         type="text",
@@ -910,10 +1353,7 @@ async def format_google_doc_text_impl(args: dict) -> list[TextContent]:
         }
     }]
 
-    docs_service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': requests}
-    ).execute()
+    await batch_update_document(doc_id, requests)
 
     return [TextContent(type="text", text=f"Applied formatting to characters {start_index}-{end_index} in document {doc_id}")]
 
@@ -932,50 +1372,41 @@ async def insert_heading_impl(args: dict) -> list[TextContent]:
     if heading_level < 1 or heading_level > 6:
         return [TextContent(type="text", text="Error: heading_level must be between 1 and 6")]
 
-    # Map heading level to Google Docs named style
-    heading_styles = {
-        1: 'HEADING_1',
-        2: 'HEADING_2',
-        3: 'HEADING_3',
-        4: 'HEADING_4',
-        5: 'HEADING_5',
-        6: 'HEADING_6'
-    }
-
-    # If at_end, get current document to find end index
-    if at_end:
-        doc = docs_service.documents().get(documentId=doc_id).execute()
-        index = doc['body']['content'][-1]['endIndex'] - 1
-
     # Insert text with newline
     text_with_newline = text + '\n'
-    end_index = index + len(text_with_newline)
 
-    requests = [
-        {
-            'insertText': {
-                'location': {'index': index},
-                'text': text_with_newline
-            }
-        },
-        {
-            'updateParagraphStyle': {
-                'range': {
-                    'startIndex': index,
-                    'endIndex': end_index
-                },
-                'paragraphStyle': {
-                    'namedStyleType': heading_styles[heading_level]
-                },
-                'fields': 'namedStyleType'
+    # Docs ranges count UTF-16 code units
+    inserted_length = doc_text_length(text_with_newline)
+
+    def requests_at(index):
+        end_index = index + inserted_length
+        return [
+            {
+                'insertText': {
+                    'location': {'index': index},
+                    'text': text_with_newline
+                }
+            },
+            {
+                'updateParagraphStyle': {
+                    'range': {
+                        'startIndex': index,
+                        'endIndex': end_index
+                    },
+                    'paragraphStyle': {
+                        'namedStyleType': _HEADING_STYLES[heading_level]
+                    },
+                    'fields': 'namedStyleType'
+                }
             }
-        }
-    ]
+        ]
 
-    docs_service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': requests}
-    ).execute()
+    if at_end:
+        await batch_update_at_end(doc_id, requests_at, inserted_length)
+    else:
+        async with document_lock(doc_id):
+            await batch_update_document(doc_id, requests_at(index))
+            shift_document_end(doc_id, inserted_length)
 
     return [TextContent(type="text", text=f"Inserted H{heading_level} heading in document {doc_id}")]
 
@@ -994,37 +1425,38 @@ async def insert_bullet_list_impl(args: dict) -> list[TextContent]:
     if not items:
         return [TextContent(type="text", text="Error: No items provided")]
 
-    # If at_end, get current document to find end index
-    if at_end:
-        doc = docs_service.documents().get(documentId=doc_id).execute()
-        index = doc['body']['content'][-1]['endIndex'] - 1
-
     # Build the list text
     list_text = '\n'.join(items) + '\n'
-    end_index = index + len(list_text)
 
-    requests = [
-        {
-            'insertText': {
-                'location': {'index': index},
-                'text': list_text
-            }
-        },
-        {
-            'createParagraphBullets': {
-                'range': {
-                    'startIndex': index,
-                    'endIndex': end_index
-                },
-                'bulletPreset': 'NUMBERED_DECIMAL_ALPHA_ROMAN' if numbered else 'BULLET_DISC_CIRCLE_SQUARE'
+    # Docs ranges count UTF-16 code units
+    inserted_length = doc_text_length(list_text)
+
+    def requests_at(index):
+        end_index = index + inserted_length
+        return [
+            {
+                'insertText': {
+                    'location': {'index': index},
+                    'text': list_text
+                }
+            },
+            {
+                'createParagraphBullets': {
+                    'range': {
+                        'startIndex': index,
+                        'endIndex': end_index
+                    },
+                    'bulletPreset': _NUMBERED_PRESET if numbered else _BULLET_PRESET
+                }
             }
-        }
-    ]
+        ]
 
-    docs_service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': requests}
-    ).execute()
+    if at_end:
+        await batch_update_at_end(doc_id, requests_at, inserted_length)
+    else:
+        async with document_lock(doc_id):
+            await batch_update_document(doc_id, requests_at(index))
+            shift_document_end(doc_id, inserted_length)
 
     list_type = "numbered" if numbered else "bullet"
     return [TextContent(type="text", text=f"Inserted {list_type} list with {len(items)} items in document {doc_id}")]
@@ -1038,159 +1470,224 @@ def parse_markdown_to_doc_requests(markdown: str) -> tuple[str, list[dict]]:
     # This will hold all the formatting requests to apply after text insertion
     format_requests = []
 
-    # Track current position in output text
-    plain_text = ""
+    # Output text fragments, joined once at the end, and the current position in it
+    text_parts = []
     current_index = 1  # Google Docs is 1-indexed
 
-    lines = markdown.split('\n')
-    i = 0
+    # Walk the string line by line without splitting it; a line runs from
+    # pos up to (not including) eol, and the text after the last newline
+    # counts as a line even when empty
+    length = len(markdown)
+    pos = 0
+    eol = markdown.find('\n')
+    if eol == -1:
+        eol = length
 
-    while i < len(lines):
-        line = lines[i]
+    while pos <= length:
+        # Only lines starting with a block marker are tried against the
+        # block patterns; everything else goes straight to inline processing
+        first = markdown[pos] if pos < eol else ''
 
         # Check for headings (# Heading)
-        heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+        heading_match = _HEADING_RE.match(markdown, pos, eol) if first == '#' else None
         if heading_match:
             level = len(heading_match.group(1))
             heading_text = heading_match.group(2) + '\n'
             start = current_index
             end = start + len(heading_text)
 
-            plain_text += heading_text
+            text_parts.append(heading_text)
             format_requests.append({
                 'updateParagraphStyle': {
                     'range': {'startIndex': start, 'endIndex': end},
-                    'paragraphStyle': {'namedStyleType': f'HEADING_{level}'},
+                    'paragraphStyle': {'namedStyleType': _HEADING_STYLES[level]},
                     'fields': 'namedStyleType'
                 }
             })
             current_index = end
-            i += 1
+            pos = eol + 1
+            eol = markdown.find('\n', pos)
+            if eol == -1:
+                eol = length
             continue
 
-        # Check for bullet list items (- item or * item)
-        if re.match(r'^[\-\*]\s+', line):
-            # Collect consecutive list items
-            list_start = current_index
-            list_items = []
-            while i < len(lines) and re.match(r'^[\-\*]\s+', lines[i]):
-                item_text = re.sub(r'^[\-\*]\s+', '', lines[i])
-                list_items.append(item_text)
-                i += 1
-
-            list_text = '\n'.join(list_items) + '\n'
-            list_end = list_start + len(list_text)
-
-            plain_text += list_text
-            format_requests.append({
-                'createParagraphBullets': {
-                    'range': {'startIndex': list_start, 'endIndex': list_end},
-                    'bulletPreset': 'BULLET_DISC_CIRCLE_SQUARE'
-                }
-            })
-            current_index = list_end
-            continue
+        # Check for bullet list items (- item or * item) and numbered
+        # list items (1. item)
+        if first == '-' or first == '*':
+            item_re = _BULLET_RE
+            preset = _BULLET_PRESET
+        elif first.isdecimal():
+            item_re = _NUMBERED_RE
+            preset = _NUMBERED_PRESET
+        else:
+            item_re = None
 
-        # Check for numbered list items (1. item)
-        if re.match(r'^\d+\.\s+', line):
+        item_match = item_re.match(markdown, pos, eol) if item_re else None
+        if item_match:
+            # Collect consecutive list items
             list_start = current_index
             list_items = []
-            while i < len(lines) and re.match(r'^\d+\.\s+', lines[i]):
-                item_text = re.sub(r'^\d+\.\s+', '', lines[i])
-                list_items.append(item_text)
-                i += 1
+            while item_match:
+                list_items.append(markdown[item_match.end():eol])
+                pos = eol + 1
+                if pos > length:
+                    break
+                eol = markdown.find('\n', pos)
+                if eol == -1:
+                    eol = length
+                item_match = item_re.match(markdown, pos, eol)
 
             list_text = '\n'.join(list_items) + '\n'
             list_end = list_start + len(list_text)
 
-            plain_text += list_text
+            text_parts.append(list_text)
             format_requests.append({
                 'createParagraphBullets': {
                     'range': {'startIndex': list_start, 'endIndex': list_end},
-                    'bulletPreset': 'NUMBERED_DECIMAL_ALPHA_ROMAN'
+                    'bulletPreset': preset
                 }
             })
             current_index = list_end
             continue
 
         # Regular paragraph - handle inline formatting
-        processed_line, inline_formats = process_inline_markdown(line, current_index)
-        if processed_line or line == '':
-            plain_text += processed_line + '\n'
+        processed_line, inline_formats = process_inline_markdown(markdown[pos:eol], current_index)
+        if processed_line or pos == eol:
+            text_parts.append(processed_line)
+            text_parts.append('\n')
             format_requests.extend(inline_formats)
             current_index += len(processed_line) + 1
 
-        i += 1
+        pos = eol + 1
+        eol = markdown.find('\n', pos)
+        if eol == -1:
+            eol = length
+
+    return ''.join(text_parts), merge_adjacent_requests(format_requests)
 
-    return plain_text, format_requests
+
+def merge_adjacent_requests(requests: list[dict]) -> list[dict]:
+    """
+    Coalesce consecutive updateTextStyle/createParagraphBullets requests that
+    apply identical settings to touching ranges into a single request.
+    """
+    merged = []
+    for request in requests:
+        kind = next(iter(request))
+        if merged and kind in _MERGEABLE_REQUESTS and kind in merged[-1]:
+            previous = merged[-1][kind]
+            current = request[kind]
+            if (previous['range']['endIndex'] == current['range']['startIndex']
+                    and {k: v for k, v in previous.items() if k != 'range'}
+                    == {k: v for k, v in current.items() if k != 'range'}):
+                merged[-1] = {kind: {
+                    **previous,
+                    'range': {
+                        'startIndex': previous['range']['startIndex'],
+                        'endIndex': current['range']['endIndex']
+                    }
+                }}
+                continue
+        merged.append(request)
+    return merged
 
 
 def process_inline_markdown(text: str, base_index: int) -> tuple[str, list[dict]]:
     """
     Process inline markdown (bold, italic, links) and return plain text plus format requests.
+
+    Markers are matched left to right: **bold** or __bold__, then *italic* or
+    _italic_, then [link](url). Each closing marker is located with str.find,
+    and every find is remembered so no stretch of the line is scanned twice
+    for the same marker, keeping the scan linear even when markers are unpaired.
     """
     format_requests = []
-    result = ""
-    current_pos = 0
-    offset = base_index
-
-    # Pattern for **bold**, *italic*, __bold__, _italic_, [link](url)
-    patterns = [
-        (r'\*\*(.+?)\*\*', 'bold'),
-        (r'__(.+?)__', 'bold'),
-        (r'\*(.+?)\*', 'italic'),
-        (r'_(.+?)_', 'italic'),
-        (r'\[([^\]]+)\]\(([^)]+)\)', 'link'),
-    ]
+    parts = []
+    last_end = 0
+    # Document index of the next character emitted
+    position = base_index
+
+    # marker -> (start, result) of the last search for it. A search starting
+    # between those two positions must land on the same result (or also
+    # come up empty), so it is answered without scanning again
+    searches = {}
+
+    def find(marker: str, start: int) -> int:
+        cached = searches.get(marker)
+        if cached and cached[0] <= start and (cached[1] == -1 or cached[1] >= start):
+            return cached[1]
+        found = text.find(marker, start)
+        searches[marker] = (start, found)
+        return found
 
-    # Process text character by character, finding and handling markdown
     i = 0
-    while i < len(text):
-        matched = False
-
-        for pattern, format_type in patterns:
-            match = re.match(pattern, text[i:])
-            if match:
-                matched = True
-                if format_type == 'link':
-                    link_text = match.group(1)
-                    link_url = match.group(2)
-                    start = offset + len(result)
-                    end = start + len(link_text)
-
-                    result += link_text
-                    format_requests.append({
-                        'updateTextStyle': {
-                            'range': {'startIndex': start, 'endIndex': end},
-                            'textStyle': {
-                                'link': {'url': link_url},
-                                'foregroundColor': {'color': {'rgbColor': {'red': 0.06, 'green': 0.46, 'blue': 0.88}}}
-                            },
-                            'fields': 'link,foregroundColor'
-                        }
-                    })
-                else:
-                    inner_text = match.group(1)
-                    start = offset + len(result)
-                    end = start + len(inner_text)
-
-                    result += inner_text
-                    format_requests.append({
-                        'updateTextStyle': {
-                            'range': {'startIndex': start, 'endIndex': end},
-                            'textStyle': {format_type: True},
-                            'fields': format_type
-                        }
-                    })
-
-                i += len(match.group(0))
-                break
-
-        if not matched:
-            result += text[i]
-            i += 1
-
-    return result, format_requests
+    while True:
+        # Jump straight to the next character that could open a marker
+        candidates = [found for found in (find('*', i), find('_', i), find('[', i)) if found != -1]
+        if not candidates:
+            break
+        i = min(candidates)
+        char = text[i]
+
+        if char == '[':
+            # [text](url): text runs to the first ']', which must be
+            # followed by '(' and a non-empty url up to the first ')'
+            text_end = find(']', i + 1)
+            if text_end <= i + 1 or not text.startswith('(', text_end + 1):
+                i += 1
+                continue
+            url_end = find(')', text_end + 2)
+            if url_end <= text_end + 2:
+                i += 1
+                continue
+
+            inner_text = text[i + 1:text_end]
+            style_request = {
+                'textStyle': {
+                    'link': {'url': text[text_end + 2:url_end]},
+                    'foregroundColor': {'color': {'rgbColor': {'red': 0.06, 'green': 0.46, 'blue': 0.88}}}
+                },
+                'fields': 'link,foregroundColor'
+            }
+            match_end = url_end + 1
+        else:
+            # A doubled marker closes on the next doubled marker at least one
+            # character on; failing that, a single marker closes on the next one
+            double = char * 2
+            close = find(double, i + 3) if text.startswith(double, i) else -1
+            if close != -1:
+                format_type = 'bold'
+                inner_text = text[i + 2:close]
+                match_end = close + 2
+            else:
+                close = find(char, i + 2)
+                if close == -1:
+                    i += 1
+                    continue
+                format_type = 'italic'
+                inner_text = text[i + 1:close]
+                match_end = close + 1
+            style_request = {
+                'textStyle': {format_type: True},
+                'fields': format_type
+            }
+
+        # Plain text before the marker is copied through unchanged
+        gap = text[last_end:i]
+        parts.append(gap)
+        start = position + len(gap)
+        end = start + len(inner_text)
+
+        parts.append(inner_text)
+        position = end
+        format_requests.append({
+            'updateTextStyle': {'range': {'startIndex': start, 'endIndex': end}, **style_request}
+        })
+        last_end = i = match_end
+
+    parts.append(text[last_end:])
+
+    return ''.join(parts), format_requests
 
 
 async def markdown_to_google_doc_impl(args: dict) -> list[TextContent]:
@@ -1202,44 +1699,31 @@ async def markdown_to_google_doc_impl(args: dict) -> list[TextContent]:
     if folder_id and not validate_google_id(folder_id):
         return [TextContent(type="text", text="Error: Invalid folder ID format")]
 
-    # Create the document
-    doc = docs_service.documents().create(body={'title': title}).execute()
-    doc_id = doc['documentId']
-
-    # If folder_id specified, move the doc there
+    # Create the document through Drive so it lands in the folder directly
+    body = {'name': title, 'mimeType': 'application/vnd.google-apps.document'}
     if folder_id:
-        file = drive_service.files().get(fileId=doc_id, fields='parents').execute()
-        previous_parents = ",".join(file.get('parents', []))
-        drive_service.files().update(
-            fileId=doc_id,
-            addParents=folder_id,
-            removeParents=previous_parents,
-            fields='id, parents'
-        ).execute()
-
-    # Parse markdown to plain text and formatting requests
-    plain_text, format_requests = parse_markdown_to_doc_requests(markdown)
+        body['parents'] = [folder_id]
+
+    # Parse markdown to plain text and formatting requests on the worker
+    # pool while the create request is in flight
+    doc, (plain_text, format_requests) = await asyncio.gather(
+        rest_json('POST', f"{DRIVE_API_URL}/files", params={'fields': 'id'}, json=body),
+        run_blocking(parse_markdown_to_doc_requests, markdown)
+    )
+    doc_id = doc['id']
 
     if plain_text:
-        # First insert all the plain text
-        insert_requests = [{
+        # Docs applies requests in order, so the text is inserted before
+        # any of the formatting that refers to it
+        requests = [{
             'insertText': {
                 'location': {'index': 1},
                 'text': plain_text
             }
         }]
+        requests.extend(format_requests)
 
-        docs_service.documents().batchUpdate(
-            documentId=doc_id,
-            body={'requests': insert_requests}
-        ).execute()
-
-        # Then apply all formatting
-        if format_requests:
-            docs_service.documents().batchUpdate(
-                documentId=doc_id,
-                body={'requests': format_requests}
-            ).execute()
+        await batch_update_document(doc_id, requests)
 
     return [TextContent(
         type="text",
@@ -1247,6 +1731,31 @@ async def markdown_to_google_doc_impl(args: dict) -> list[TextContent]:
     )]
 
 
+# Tool name -> implementation, used by call_tool for dispatch
+_HANDLERS = {
+    "list_files": list_files_impl,
+    "read_file": read_file_impl,
+    "create_file": create_file_impl,
+    "update_file": update_file_impl,
+    "delete_file": delete_file_impl,
+    "batch_delete_files": batch_delete_files_impl,
+    "create_folder": create_folder_impl,
+    "search_files": search_files_impl,
+    "create_google_doc": create_google_doc_impl,
+    "append_to_google_doc": append_to_google_doc_impl,
+    "replace_google_doc_content": replace_google_doc_content_impl,
+    "read_google_doc": read_google_doc_impl,
+    "move_file": move_file_impl,
+    "batch_move_files": batch_move_files_impl,
+    "copy_file": copy_file_impl,
+    "upload_binary_file": upload_binary_file_impl,
+    "format_google_doc_text": format_google_doc_text_impl,
+    "insert_heading": insert_heading_impl,
+    "insert_bullet_list": insert_bullet_list_impl,
+    "markdown_to_google_doc": markdown_to_google_doc_impl,
+}
+
+
 async def main():
     """Run the MCP server"""
     logger.info("Starting Google Drive MCP Server...")
@@ -1259,11 +1768,20 @@ async def main():
     logger.info(f"Using credentials from: {CREDS_PATH}")
     logger.info(f"Token will be saved to: {TOKEN_PATH}")
     
+    # Load the MIME type tables now rather than on the first upload
+    mimetypes.init()
+
+    # Parse the discovery documents before the first tool call arrives
+    await run_blocking(init_services)
+
     # Run server
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        if _rest_client is not None:
+            await _rest_client.aclose()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
 